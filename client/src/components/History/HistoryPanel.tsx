@@ -7,6 +7,24 @@ interface HistoryPanelProps {
   onClose: () => void;
 }
 
+/**
+ * 操作类型对应的图标
+ */
+const ACTION_ICONS: Record<HistoryRecord['actionType'], string> = {
+  create_node: '➕',
+  update_node: '✏️',
+  delete_node: '🗑️',
+  create_relation: '🔗',
+  delete_relation: '✂️',
+  move_node: '↔️',
+  update_conversation: '💬'
+};
+
+/**
+ * 未知操作类型的默认图标
+ */
+const DEFAULT_ACTION_ICON = '📝';
+
 /**
  * 历史版本管理面板
  */
@@ -16,27 +34,6 @@ const HistoryPanel: React.FC<HistoryPanelProps> = ({ isOpen, onClose: _onClose }
   const canUndo = historyIndex >= 0;
   const canRedo = historyIndex < history.length - 1;
 
-  const getActionIcon = (actionType: HistoryRecord['actionType']) => {
-    switch (actionType) {
-      case 'create_node':
-        return '➕';
-      case 'update_node':
-        return '✏️';
-      case 'delete_node':
-        return '🗑️';
-      case 'create_relation':
-        return '🔗';
-      case 'delete_relation':
-        return '✂️';
-      case 'move_node':
-        return '↔️';
-      case 'update_conversation':
-        return '💬';
-      default:
-        return '📝';
-    }
-  };
-
   if (!isOpen) return null;
 
   return (
@@ -95,7 +92,7 @@ const HistoryPanel: React.FC<HistoryPanelProps> = ({ isOpen, onClose: _onClose }
                   }`}
                 >
                   <div className="flex items-start gap-3">
-                    <span className="text-lg">{getActionIcon(record.actionType)}</span>
+                    <span className="text-lg">{ACTION_ICONS[record.actionType] ?? DEFAULT_ACTION_ICON}</span>
                     <div className="flex-1 min-w-0">
                       <p className="text-sm text-white truncate">
                         {record.description}
@@ -1,6 +1,8 @@
 import { create } from 'zustand';
-import { persist } from 'zustand/middleware';
+import { persist, createJSONStorage } from 'zustand/middleware';
+import type { PersistStorage } from 'zustand/middleware';
 import type { IMessage } from '../types';
+import { getConversationContextCached } from '../utils/conversationContext';
 
 /**
  * 关系类型定义
@@ -104,14 +106,24 @@ export interface ConversationData {
 }
 
 /**
- * 最大历史记录深度
+ * 最大历史记录数量
  */
-const MAX_CONTEXT_DEPTH = 20;
+const MAX_HISTORY_SIZE = 50;
 
 /**
- * 最大历史记录数量
+ * 搜索结果中对话片段的最大长度
  */
-const MAX_HISTORY_SIZE = 50;
+const SEARCH_SNIPPET_LENGTH = 50;
+
+/**
+ * 截断文本，仅在超出长度时追加省略号
+ * @param text - 原始文本
+ * @param maxLength - 最大长度
+ * @returns 截断后的文本
+ */
+const truncateText = (text: string, maxLength: number): string => {
+  return text.length > maxLength ? `${text.slice(0, maxLength)}...` : text;
+};
 
 /**
  * 应用状态接口
@@ -216,24 +228,27 @@ const createDefaultNode = (
   title: string,
   position: { x: number; y: number },
   isRoot: boolean = false
-): NodeData => ({
-  id,
-  title,
-  summary: '',
-  parentIds: [],
-  childrenIds: [],
-  isRoot,
-  isComposite: false,
-  compositeChildren: undefined,
-  compositeParent: undefined,
-  hidden: false,
-  conversationId: null,
-  position,
-  createdAt: new Date(),
-  updatedAt: new Date(),
-  tags: [],
-  expanded: true
-});
+): NodeData => {
+  const now = new Date();
+  return {
+    id,
+    title,
+    summary: '',
+    parentIds: [],
+    childrenIds: [],
+    isRoot,
+    isComposite: false,
+    compositeChildren: undefined,
+    compositeParent: undefined,
+    hidden: false,
+    conversationId: null,
+    position,
+    createdAt: now,
+    updatedAt: now,
+    tags: [],
+    expanded: true
+  };
+};
 
 /**
  * 迁移节点数据格式
@@ -276,6 +291,67 @@ const migrateRelationsData = (relations: any): RelationData[] => {
   return relations.filter((r: any) => r && r.type && r.id && r.sourceId && r.targetId);
 };
 
+/**
+ * 持久化状态结构
+ */
+interface PersistedAppState {
+  nodes: [string, NodeData][];
+  relations: RelationData[];
+  conversations: [string, ConversationData][];
+}
+
+/**
+ * 创建带记忆的持久化状态选择器
+ * nodes/relations/conversations 引用均未变化时（如悬停、选中节点）返回上一次的结果
+ * @returns partialize 函数
+ */
+const createPersistPartializer = () => {
+  let lastSource: [AppState['nodes'], AppState['relations'], AppState['conversations']] | null = null;
+  let lastValue: PersistedAppState | null = null;
+
+  return (state: AppState): PersistedAppState => {
+    if (
+      lastValue &&
+      lastSource &&
+      lastSource[0] === state.nodes &&
+      lastSource[1] === state.relations &&
+      lastSource[2] === state.conversations
+    ) {
+      return lastValue;
+    }
+
+    lastSource = [state.nodes, state.relations, state.conversations];
+    lastValue = {
+      nodes: Array.from(state.nodes.entries()),
+      relations: state.relations,
+      conversations: Array.from(state.conversations.entries())
+    };
+    return lastValue;
+  };
+};
+
+/**
+ * 创建跳过重复写入的持久化存储
+ * 与上次写入的是同一状态对象时，不再执行 JSON 序列化和 localStorage 写入
+ * @returns 持久化存储，localStorage 不可用时返回 undefined
+ */
+const createDedupedStorage = (): PersistStorage<PersistedAppState> | undefined => {
+  const storage = createJSONStorage<PersistedAppState>(() => localStorage);
+  if (!storage) return undefined;
+
+  let lastWritten: PersistedAppState | null = null;
+
+  return {
+    getItem: (name) => storage.getItem(name),
+    setItem: (name, value) => {
+      if (value.state === lastWritten) return;
+      lastWritten = value.state;
+      return storage.setItem(name, value);
+    },
+    removeItem: (name) => storage.removeItem(name)
+  };
+};
+
 /**
  * 应用状态管理Store
  */
@@ -390,10 +466,11 @@ export const useAppStore = create<AppState>()(
        */
       addNode: (node) => {
         const id = node.id;
+        const now = new Date();
         const newNode: NodeData = {
           ...node,
-          createdAt: new Date(),
-          updatedAt: new Date()
+          createdAt: now,
+          updatedAt: now
         };
         
         set((state) => {
@@ -577,6 +654,7 @@ export const useAppStore = create<AppState>()(
        */
       addConversation: (nodeId) => {
         const id = generateId();
+        const now = new Date();
         const newConversation: ConversationData = {
           id,
           nodeId,
@@ -585,8 +663,8 @@ export const useAppStore = create<AppState>()(
             includeParentHistory: true,
             includeRelatedNodes: []
           },
-          createdAt: new Date(),
-          updatedAt: new Date()
+          createdAt: now,
+          updatedAt: now
         };
         
         set((state) => {
@@ -611,6 +689,7 @@ export const useAppStore = create<AppState>()(
        * @param message - 消息内容
        */
       addMessage: (conversationId, message) => {
+        const now = new Date();
         set((state) => {
           const newConversations = new Map(state.conversations);
           const conversation = newConversations.get(conversationId);
@@ -622,10 +701,10 @@ export const useAppStore = create<AppState>()(
                 {
                   ...message,
                   _id: generateId(),
-                  timestamp: new Date()
+                  timestamp: now
                 }
               ],
-              updatedAt: new Date()
+              updatedAt: now
             });
           }
           return { conversations: newConversations };
@@ -654,76 +733,13 @@ export const useAppStore = create<AppState>()(
       /**
        * 获取节点的对话上下文（包含祖先节点历史）
        * 支持多父节点继承，完整追溯所有祖先链
+       * 节点、对话与关系均未变化时复用缓存结果
        * @param nodeId - 节点ID
        * @returns 上下文消息列表（按时间顺序排列）
        */
       getConversationContext: (nodeId) => {
         const { nodes, conversations, relations } = get();
-        const contextMessages: { role: 'user' | 'assistant' | 'system'; content: string }[] = [];
-        const visitedNodes = new Set<string>();
-        const nodeOrder: string[] = [];
-        
-        /**
-         * 拓扑排序收集节点顺序
-         * 确保父节点在子节点之前被处理
-         * @param currentNodeId - 当前节点ID
-         * @param depth - 递归深度
-         */
-        const collectNodeOrder = (currentNodeId: string, depth: number = 0) => {
-          if (visitedNodes.has(currentNodeId) || depth > MAX_CONTEXT_DEPTH) return;
-          visitedNodes.add(currentNodeId);
-          
-          const currentNode = nodes.get(currentNodeId);
-          if (!currentNode) return;
-          
-          /**
-           * 首先处理所有父节点（通过 parentIds）
-           * 这确保了父节点的上下文在子节点之前
-           */
-          currentNode.parentIds.forEach(parentId => {
-            collectNodeOrder(parentId, depth + 1);
-          });
-          
-          /**
-           * 然后处理通过关系连接的源节点
-           * 包括 supports, prerequisite, elaborates 等类型
-           */
-          relations.forEach((relation) => {
-            if (relation.targetId === currentNodeId) {
-              collectNodeOrder(relation.sourceId, depth + 1);
-            }
-          });
-          
-          nodeOrder.push(currentNodeId);
-        };
-        
-        collectNodeOrder(nodeId);
-        
-        /**
-         * 按拓扑顺序收集消息
-         */
-        nodeOrder.forEach(orderedNodeId => {
-          const node = nodes.get(orderedNodeId);
-          if (!node) return;
-          
-          if (node.conversationId) {
-            const conv = conversations.get(node.conversationId);
-            if (conv && conv.messages.length > 0) {
-              contextMessages.push({
-                role: 'system',
-                content: `[节点: ${node.title}]`
-              });
-              conv.messages.forEach(msg => {
-                contextMessages.push({
-                  role: msg.role,
-                  content: msg.content
-                });
-              });
-            }
-          }
-        });
-        
-        return contextMessages;
+        return getConversationContextCached(nodeId, nodes, conversations, relations);
       },
       
       /**
@@ -828,7 +844,7 @@ export const useAppStore = create<AppState>()(
             if (conversation) {
               conversation.messages.forEach(msg => {
                 if (msg.content.toLowerCase().includes(query)) {
-                  matches.push(`对话: ${msg.content.substring(0, 50)}...`);
+                  matches.push(`对话: ${truncateText(msg.content, SEARCH_SNIPPET_LENGTH)}`);
                 }
               });
             }
@@ -849,6 +865,7 @@ export const useAppStore = create<AppState>()(
        */
       createCompositeNode: (nodeIds, title) => {
         const compositeId = generateId();
+        const now = new Date();
         
         set((state) => {
           const newNodes = new Map(state.nodes);
@@ -879,8 +896,8 @@ export const useAppStore = create<AppState>()(
             hidden: false,
             conversationId: null,
             position: { x: centerX, y: centerY },
-            createdAt: new Date(),
-            updatedAt: new Date(),
+            createdAt: now,
+            updatedAt: now,
             tags: [],
             expanded: false
           };
@@ -1011,11 +1028,8 @@ export const useAppStore = create<AppState>()(
     }),
     {
       name: 'deep-mind-map-storage',
-      partialize: (state) => ({
-        nodes: Array.from(state.nodes.entries()),
-        relations: state.relations,
-        conversations: Array.from(state.conversations.entries())
-      }),
+      storage: createDedupedStorage(),
+      partialize: createPersistPartializer(),
       onRehydrateStorage: () => (state) => {
         if (state) {
           state.nodes = new Map(state.nodes as any);
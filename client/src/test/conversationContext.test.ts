@@ -0,0 +1,201 @@
+import { describe, it, expect } from 'vitest';
+import type { NodeData, RelationData, ConversationData } from '../stores/appStore';
+import {
+  buildConversationContext,
+  getConversationContextCached,
+  MAX_CONTEXT_DEPTH
+} from '../utils/conversationContext';
+
+/**
+ * 创建测试节点
+ */
+const createNode = (id: string, parentIds: string[] = [], conversationId: string | null = null): NodeData => ({
+  id,
+  title: id,
+  summary: '',
+  parentIds,
+  childrenIds: [],
+  isRoot: parentIds.length === 0,
+  isComposite: false,
+  hidden: false,
+  conversationId,
+  position: { x: 0, y: 0 },
+  createdAt: new Date(),
+  updatedAt: new Date(),
+  tags: [],
+  expanded: true
+});
+
+/**
+ * 创建测试对话
+ */
+const createConversation = (id: string, nodeId: string, contents: string[]): ConversationData => ({
+  id,
+  nodeId,
+  messages: contents.map((content, index) => ({
+    _id: `${id}-${index}`,
+    role: index % 2 === 0 ? 'user' : 'assistant',
+    content,
+    timestamp: new Date()
+  })),
+  contextConfig: {
+    includeParentHistory: true,
+    includeRelatedNodes: []
+  },
+  createdAt: new Date(),
+  updatedAt: new Date()
+});
+
+/**
+ * 创建测试关系
+ */
+const createRelation = (sourceId: string, targetId: string): RelationData => ({
+  id: `${sourceId}->${targetId}`,
+  sourceId,
+  targetId,
+  type: 'supports',
+  createdAt: new Date()
+});
+
+/**
+ * 提取上下文中的节点标题消息
+ */
+const headersOf = (context: { content: string }[]) =>
+  context.map(msg => msg.content).filter(content => content.startsWith('[节点: '));
+
+describe('Conversation Context', () => {
+  const nodes = new Map<string, NodeData>([
+    ['root', createNode('root', [], 'conv-root')],
+    ['child', createNode('child', ['root'], 'conv-child')]
+  ]);
+  const conversations = new Map<string, ConversationData>([
+    ['conv-root', createConversation('conv-root', 'root', ['Root Q', 'Root A'])],
+    ['conv-child', createConversation('conv-child', 'child', ['Child Q'])]
+  ]);
+  const relations: RelationData[] = [];
+
+  it('should place ancestor messages before the node itself', () => {
+    const context = buildConversationContext('child', nodes, conversations, relations);
+
+    expect(context.map(msg => msg.content)).toEqual([
+      '[节点: root]',
+      'Root Q',
+      'Root A',
+      '[节点: child]',
+      'Child Q'
+    ]);
+  });
+
+  it('should include a shared ancestor only once in diamond inheritance', () => {
+    const diamondNodes = new Map<string, NodeData>([
+      ['top', createNode('top', [], 'conv-top')],
+      ['left', createNode('left', ['top'], 'conv-left')],
+      ['right', createNode('right', ['top'], 'conv-right')],
+      ['bottom', createNode('bottom', ['left', 'right'], null)]
+    ]);
+    const diamondConversations = new Map<string, ConversationData>([
+      ['conv-top', createConversation('conv-top', 'top', ['Top'])],
+      ['conv-left', createConversation('conv-left', 'left', ['Left'])],
+      ['conv-right', createConversation('conv-right', 'right', ['Right'])]
+    ]);
+
+    const context = buildConversationContext('bottom', diamondNodes, diamondConversations, relations);
+
+    expect(context.map(msg => msg.content)).toEqual([
+      '[节点: top]',
+      'Top',
+      '[节点: left]',
+      'Left',
+      '[节点: right]',
+      'Right'
+    ]);
+  });
+
+  it('should reuse the cached result while state is unchanged', () => {
+    const first = getConversationContextCached('child', nodes, conversations, relations);
+    const second = getConversationContextCached('child', nodes, conversations, relations);
+
+    expect(second).toBe(first);
+  });
+
+  it('should recompute after conversations are replaced', () => {
+    const first = getConversationContextCached('child', nodes, conversations, relations);
+
+    const updatedConversations = new Map(conversations);
+    updatedConversations.set('conv-child', createConversation('conv-child', 'child', ['Child Q', 'Child A']));
+    const second = getConversationContextCached('child', nodes, updatedConversations, relations);
+
+    expect(second).not.toBe(first);
+    expect(second[second.length - 1].content).toBe('Child A');
+  });
+
+  describe('with relations', () => {
+    const relatedNodes = new Map<string, NodeData>([
+      ['parent', createNode('parent', [], 'conv-parent')],
+      ['source', createNode('source', [], 'conv-source')],
+      ['target', createNode('target', ['parent'], 'conv-target')]
+    ]);
+    const relatedConversations = new Map<string, ConversationData>([
+      ['conv-parent', createConversation('conv-parent', 'parent', ['Parent'])],
+      ['conv-source', createConversation('conv-source', 'source', ['Source'])],
+      ['conv-target', createConversation('conv-target', 'target', ['Target'])]
+    ]);
+    const incoming = [createRelation('source', 'target')];
+
+    it('should walk relation sources after parentIds', () => {
+      const context = buildConversationContext('target', relatedNodes, relatedConversations, incoming);
+
+      expect(headersOf(context)).toEqual(['[节点: parent]', '[节点: source]', '[节点: target]']);
+    });
+
+    it('should include a relation source for a node without parents', () => {
+      const context = buildConversationContext('parent', relatedNodes, relatedConversations, [createRelation('source', 'parent')]);
+
+      expect(headersOf(context)).toEqual(['[节点: source]', '[节点: parent]']);
+    });
+
+    it('should recompute when the relations array is replaced', () => {
+      const before = getConversationContextCached('target', relatedNodes, relatedConversations, []);
+      const after = getConversationContextCached('target', relatedNodes, relatedConversations, incoming);
+
+      expect(headersOf(before)).toEqual(['[节点: parent]', '[节点: target]']);
+      expect(headersOf(after)).toEqual(['[节点: parent]', '[节点: source]', '[节点: target]']);
+    });
+
+    it('should keep relation ancestors after a conversation-only update', () => {
+      getConversationContextCached('target', relatedNodes, relatedConversations, incoming);
+
+      const updatedConversations = new Map(relatedConversations);
+      updatedConversations.set('conv-source', createConversation('conv-source', 'source', ['Source', 'Source 2']));
+      const context = getConversationContextCached('target', relatedNodes, updatedConversations, incoming);
+
+      expect(context.map(msg => msg.content)).toEqual([
+        '[节点: parent]',
+        'Parent',
+        '[节点: source]',
+        'Source',
+        'Source 2',
+        '[节点: target]',
+        'Target'
+      ]);
+    });
+  });
+
+  it('should stop at the maximum context depth', () => {
+    const chainLength = MAX_CONTEXT_DEPTH + 3;
+    const chainNodes = new Map<string, NodeData>();
+    const chainConversations = new Map<string, ConversationData>();
+    for (let i = 0; i < chainLength; i++) {
+      const id = `n${i}`;
+      chainNodes.set(id, createNode(id, i === 0 ? [] : [`n${i - 1}`], `conv-${id}`));
+      chainConversations.set(`conv-${id}`, createConversation(`conv-${id}`, id, [id]));
+    }
+
+    const context = buildConversationContext(`n${chainLength - 1}`, chainNodes, chainConversations, []);
+    const headers = headersOf(context);
+
+    expect(headers).toHaveLength(MAX_CONTEXT_DEPTH + 1);
+    expect(headers[0]).toBe('[节点: n2]');
+    expect(headers[headers.length - 1]).toBe(`[节点: n${chainLength - 1}]`);
+  });
+});
@@ -0,0 +1,332 @@
+import type { NodeData, RelationData, ConversationData } from '../stores/appStore';
+import type { IMessage } from '../types';
+
+/**
+ * 上下文消息接口
+ */
+export interface ContextMessage {
+  role: 'user' | 'assistant' | 'system';
+  content: string;
+}
+
+/**
+ * 最大历史记录深度
+ */
+export const MAX_CONTEXT_DEPTH = 20;
+
+/**
+ * 节点标题系统消息的前后缀
+ */
+const NODE_HEADER_PREFIX = '[节点: ';
+const NODE_HEADER_SUFFIX = ']';
+
+/**
+ * 节点标题系统消息缓存
+ * 修改标题时 Store 会替换节点对象，以节点引用为键即可保证缓存有效
+ */
+const nodeHeaderCache = new WeakMap<NodeData, ContextMessage>();
+
+/**
+ * 获取节点的标题系统消息，同一节点对象只创建一次
+ * @param node - 节点数据
+ * @returns 标题系统消息
+ */
+const getNodeHeader = (node: NodeData): ContextMessage => {
+  let header = nodeHeaderCache.get(node);
+  if (!header) {
+    header = {
+      role: 'system',
+      content: NODE_HEADER_PREFIX + node.title + NODE_HEADER_SUFFIX
+    };
+    nodeHeaderCache.set(node, header);
+  }
+  return header;
+};
+
+/**
+ * 关系入边索引缓存：targetId -> sourceId 列表
+ * relations 数组在 Store 更新时整体替换，以数组引用为键即可保证索引有效
+ */
+const incomingIndexCache = new WeakMap<RelationData[], Map<string, string[]>>();
+
+/**
+ * 获取关系列表的入边索引，同一数组只构建一次
+ * @param relations - 关系列表
+ * @returns 目标节点ID到源节点ID列表的映射
+ */
+const getIncomingIndex = (relations: RelationData[]): Map<string, string[]> => {
+  let index = incomingIndexCache.get(relations);
+  if (!index) {
+    index = new Map();
+    for (const relation of relations) {
+      const sources = index.get(relation.targetId);
+      if (sources) {
+        sources.push(relation.sourceId);
+      } else {
+        index.set(relation.targetId, [relation.sourceId]);
+      }
+    }
+    incomingIndexCache.set(relations, index);
+  }
+  return index;
+};
+
+/**
+ * 单条消息转换缓存
+ * 消息创建后不再修改，追加新消息时已有消息可直接复用转换结果
+ */
+const contextMessageCache = new WeakMap<IMessage, ContextMessage>();
+
+/**
+ * 将单条对话消息转换为上下文消息，同一消息只转换一次
+ * @param msg - 对话消息
+ * @returns 上下文消息
+ */
+const toContextMessage = (msg: IMessage): ContextMessage => {
+  let contextMessage = contextMessageCache.get(msg);
+  if (!contextMessage) {
+    contextMessage = {
+      role: msg.role,
+      content: msg.content
+    };
+    contextMessageCache.set(msg, contextMessage);
+  }
+  return contextMessage;
+};
+
+/**
+ * 对话消息序列化缓存
+ * 新增或清空消息时 Store 会替换 messages 数组，以数组引用为键即可保证缓存有效
+ */
+const serializedMessagesCache = new WeakMap<IMessage[], ContextMessage[]>();
+
+/**
+ * 将对话消息转换为上下文消息，同一消息数组只转换一次
+ * @param messages - 对话消息列表
+ * @returns 上下文消息列表
+ */
+const getSerializedMessages = (messages: IMessage[]): ContextMessage[] => {
+  let serialized = serializedMessagesCache.get(messages);
+  if (!serialized) {
+    serialized = messages.map(toContextMessage);
+    serializedMessagesCache.set(messages, serialized);
+  }
+  return serialized;
+};
+
+/**
+ * 祖先遍历栈帧
+ */
+interface TraversalFrame {
+  nodeId: string;
+  depth: number;
+  predecessorIds: string[];
+  index: number;
+}
+
+/**
+ * 收集节点及其全部祖先的拓扑顺序
+ * 支持多父节点继承，完整追溯所有祖先链
+ * @param nodeId - 节点ID
+ * @param nodes - 节点映射
+ * @param relations - 关系列表
+ * @returns 节点ID列表（祖先在前，节点自身在最后）
+ */
+const collectAncestorOrder = (
+  nodeId: string,
+  nodes: Map<string, NodeData>,
+  relations: RelationData[]
+): string[] => {
+  const incomingIndex = getIncomingIndex(relations);
+
+  /**
+   * 快速路径：根节点既无父节点也无入边关系，上下文只包含自身
+   */
+  const startNode = nodes.get(nodeId);
+  if (!startNode) return [];
+  if (startNode.parentIds.length === 0 && !incomingIndex.has(nodeId)) {
+    return [nodeId];
+  }
+
+  const visitedNodes = new Set<string>();
+  const nodeOrder: string[] = [];
+  const stack: TraversalFrame[] = [];
+
+  /**
+   * 进入节点：标记已访问并压栈，待其前驱全部处理后再输出；无前驱的节点直接输出
+   * 前驱顺序为先 parentIds，后通过关系连接的源节点（supports, prerequisite, elaborates 等）
+   * 这确保了父节点的上下文在子节点之前
+   * @param currentNodeId - 当前节点ID
+   * @param depth - 遍历深度
+   */
+  const enterNode = (currentNodeId: string, depth: number) => {
+    if (visitedNodes.has(currentNodeId) || depth > MAX_CONTEXT_DEPTH) return;
+    visitedNodes.add(currentNodeId);
+
+    const currentNode = nodes.get(currentNodeId);
+    if (!currentNode) return;
+
+    const sourceIds = incomingIndex.get(currentNodeId);
+    if (currentNode.parentIds.length === 0 && !sourceIds) {
+      nodeOrder.push(currentNodeId);
+      return;
+    }
+
+    stack.push({
+      nodeId: currentNodeId,
+      depth,
+      predecessorIds: sourceIds ? currentNode.parentIds.concat(sourceIds) : currentNode.parentIds,
+      index: 0
+    });
+  };
+
+  /**
+   * 拓扑排序收集节点顺序（显式栈后序遍历，避免深层祖先链的递归开销）
+   */
+  enterNode(nodeId, 0);
+  while (stack.length > 0) {
+    const frame = stack[stack.length - 1];
+    if (frame.index < frame.predecessorIds.length) {
+      enterNode(frame.predecessorIds[frame.index++], frame.depth + 1);
+    } else {
+      stack.pop();
+      nodeOrder.push(frame.nodeId);
+    }
+  }
+
+  return nodeOrder;
+};
+
+/**
+ * 祖先顺序缓存
+ * 祖先顺序只取决于节点与关系，对话更新（每轮聊天都会发生）不会使其失效
+ */
+interface AncestorOrderCache {
+  nodes: Map<string, NodeData> | null;
+  relations: RelationData[] | null;
+  entries: Map<string, string[]>;
+}
+
+const ancestorOrderCache: AncestorOrderCache = {
+  nodes: null,
+  relations: null,
+  entries: new Map()
+};
+
+/**
+ * 获取节点及其全部祖先的拓扑顺序，节点与关系引用未变化时复用上次的遍历结果
+ * @param nodeId - 节点ID
+ * @param nodes - 节点映射
+ * @param relations - 关系列表
+ * @returns 节点ID列表（祖先在前，节点自身在最后）
+ */
+const getAncestorOrder = (
+  nodeId: string,
+  nodes: Map<string, NodeData>,
+  relations: RelationData[]
+): string[] => {
+  if (ancestorOrderCache.nodes !== nodes || ancestorOrderCache.relations !== relations) {
+    ancestorOrderCache.nodes = nodes;
+    ancestorOrderCache.relations = relations;
+    ancestorOrderCache.entries.clear();
+  }
+
+  let nodeOrder = ancestorOrderCache.entries.get(nodeId);
+  if (!nodeOrder) {
+    nodeOrder = collectAncestorOrder(nodeId, nodes, relations);
+    ancestorOrderCache.entries.set(nodeId, nodeOrder);
+  }
+
+  return nodeOrder;
+};
+
+/**
+ * 构建节点的对话上下文（包含祖先节点历史）
+ * 支持多父节点继承，完整追溯所有祖先链
+ * @param nodeId - 节点ID
+ * @param nodes - 节点映射
+ * @param conversations - 对话映射
+ * @param relations - 关系列表
+ * @returns 上下文消息列表（按时间顺序排列）
+ */
+export const buildConversationContext = (
+  nodeId: string,
+  nodes: Map<string, NodeData>,
+  conversations: Map<string, ConversationData>,
+  relations: RelationData[]
+): ContextMessage[] => {
+  const nodeOrder = getAncestorOrder(nodeId, nodes, relations);
+  const contextMessages: ContextMessage[] = [];
+
+  /**
+   * 按拓扑顺序收集消息
+   */
+  for (const orderedNodeId of nodeOrder) {
+    const node = nodes.get(orderedNodeId);
+    if (!node?.conversationId) continue;
+
+    const conv = conversations.get(node.conversationId);
+    if (conv && conv.messages.length > 0) {
+      contextMessages.push(getNodeHeader(node));
+      for (const msg of getSerializedMessages(conv.messages)) {
+        contextMessages.push(msg);
+      }
+    }
+  }
+
+  return contextMessages;
+};
+
+/**
+ * 上下文缓存
+ * Store 每次更新都会替换 nodes/conversations/relations 的引用，
+ * 因此三者引用均未变化时，缓存的上下文必然仍然有效
+ */
+interface ContextCache {
+  nodes: Map<string, NodeData> | null;
+  conversations: Map<string, ConversationData> | null;
+  relations: RelationData[] | null;
+  entries: Map<string, ContextMessage[]>;
+}
+
+const contextCache: ContextCache = {
+  nodes: null,
+  conversations: null,
+  relations: null,
+  entries: new Map()
+};
+
+/**
+ * 获取节点的对话上下文，状态未变化时直接复用上次的计算结果
+ * 返回的数组在多次调用间共享，调用方不应修改
+ * @param nodeId - 节点ID
+ * @param nodes - 节点映射
+ * @param conversations - 对话映射
+ * @param relations - 关系列表
+ * @returns 上下文消息列表（按时间顺序排列）
+ */
+export const getConversationContextCached = (
+  nodeId: string,
+  nodes: Map<string, NodeData>,
+  conversations: Map<string, ConversationData>,
+  relations: RelationData[]
+): ContextMessage[] => {
+  if (
+    contextCache.nodes !== nodes ||
+    contextCache.conversations !== conversations ||
+    contextCache.relations !== relations
+  ) {
+    contextCache.nodes = nodes;
+    contextCache.conversations = conversations;
+    contextCache.relations = relations;
+    contextCache.entries.clear();
+  }
+
+  let messages = contextCache.entries.get(nodeId);
+  if (!messages) {
+    messages = buildConversationContext(nodeId, nodes, conversations, relations);
+    contextCache.entries.set(nodeId, messages);
+  }
+
+  return messages;
+};
@@ -6,6 +6,7 @@ export const config = {
   server: {
     port: parseInt(process.env.PORT || '3001', 10),
     host: process.env.HOST || 'localhost',
+    keepAliveTimeout: parseInt(process.env.KEEP_ALIVE_TIMEOUT || '65000', 10),
   },
   
   neo4j: {
@@ -5,6 +5,7 @@ import compression from 'compression';
 import morgan from 'morgan';
 import path from 'path';
 import fs from 'fs';
+import { createHash } from 'crypto';
 import { config } from './config';
 import { 
   rateLimiter, 
@@ -38,6 +39,34 @@ app.use(cors({
   credentials: true,
 }));
 app.use(compression());
+
+const clientDistPath = process.env.CLIENT_DIST_PATH || path.join(__dirname, '../../client/dist');
+console.log('📂 Client dist path:', clientDistPath);
+console.log('📂 Client dist exists:', fs.existsSync(clientDistPath));
+console.log('📂 Current __dirname:', __dirname);
+
+const clientIndexPath = path.join(clientDistPath, 'index.html');
+const hasClientDist = fs.existsSync(clientIndexPath);
+
+/**
+ * 静态资源挂载在请求体解析、日志与限流中间件之前，
+ * 命中的文件直接由 express.static 返回，未命中时才继续进入后续中间件
+ * 根路径不映射到 index.html，与前端路由一样回退到内存中的入口页
+ */
+if (hasClientDist) {
+  console.log('✅ Serving static files from:', clientDistPath);
+  const hashedAssetsPrefix = `assets${path.sep}`;
+
+  app.use(express.static(clientDistPath, {
+    index: false,
+    setHeaders: (res, filePath) => {
+      if (path.relative(clientDistPath, filePath).startsWith(hashedAssetsPrefix)) {
+        res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+      }
+    },
+  }));
+}
+
 app.use(express.json({ limit: '10mb' }));
 app.use(express.urlencoded({ extended: true }));
 app.use(morgan('dev'));
@@ -76,27 +105,27 @@ app.use('/api/ai', aiRouter);
 
 app.use(errorHandler);
 
-const clientDistPath = process.env.CLIENT_DIST_PATH || path.join(__dirname, '../../client/dist');
-console.log('📂 Client dist path:', clientDistPath);
-console.log('📂 Client dist exists:', fs.existsSync(clientDistPath));
-console.log('📂 Current __dirname:', __dirname);
+if (hasClientDist) {
+  /**
+   * SPA 入口页在启动时读入内存，前端路由回退无需每次访问磁盘
+   * 入口页的 ETag 同样在启动时计算一次，no-cache 重新验证时直接返回 304，无需每次哈希响应体
+   */
+  const indexHtml = fs.readFileSync(clientIndexPath);
+  const indexEtag = `"${createHash('sha1').update(indexHtml).digest('base64')}"`;
 
-if (fs.existsSync(clientDistPath)) {
-  console.log('✅ Serving static files from:', clientDistPath);
-  app.use(express.static(clientDistPath));
-  
-  app.get('*', (req, res, next) => {
+  app.get('*', (req, res) => {
     if (req.path.startsWith('/api/')) {
       return res.status(404).json({
         success: false,
         error: 'API endpoint not found',
       });
     }
-    res.sendFile(path.join(clientDistPath, 'index.html'), (err) => {
-      if (err) {
-        next(err);
-      }
-    });
+    res.setHeader('Cache-Control', 'no-cache');
+    res.setHeader('ETag', indexEtag);
+    if (req.fresh) {
+      return res.status(304).end();
+    }
+    res.type('html').send(indexHtml);
   });
 } else {
   console.warn('⚠️ Client dist not found at:', clientDistPath);
@@ -152,6 +181,13 @@ async function startServer() {
       console.log('');
     });
 
+    /**
+     * 延长空闲连接保活时间，使同一会话的多轮对话复用已建立的连接
+     * headersTimeout 必须大于 keepAliveTimeout，否则复用的连接可能被提前断开
+     */
+    server.keepAliveTimeout = config.server.keepAliveTimeout;
+    server.headersTimeout = config.server.keepAliveTimeout + 1000;
+
     server.on('error', (error: any) => {
       if (error.code === 'EADDRINUSE') {
         console.error(`❌ Port ${port} is already in use`);
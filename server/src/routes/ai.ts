@@ -1,6 +1,14 @@
 import { Router, Request, Response } from 'express';
 import { aiService } from '../services/aiService';
 import { optionalAuth } from '../middleware';
+import {
+  SSE_PREFIX,
+  SSE_SUFFIX,
+  DONE_EVENT_HEAD,
+  EVENT_TAIL,
+  SSEWriter,
+  ContentFrameBatcher,
+} from '../utils/sse';
 
 const router = Router();
 
@@ -43,6 +51,9 @@ router.post('/chat', optionalAuth, async (req: Request, res: Response) => {
  * 流式聊天接口（SSE）
  */
 router.post('/chat/stream', optionalAuth, async (req: Request, res: Response) => {
+  const writer = new SSEWriter(res);
+  const batcher = new ContentFrameBatcher(writer);
+
   try {
     const { messages, config, model, temperature, maxTokens } = req.body;
     
@@ -74,27 +85,39 @@ router.post('/chat/stream', optionalAuth, async (req: Request, res: Response) =>
       baseUrl,
     });
 
-    let fullContent = '';
+    const contentParts: string[] = [];
+    let clientClosed = false;
+
+    res.on('close', () => {
+      if (!res.writableFinished) {
+        clientClosed = true;
+      }
+    });
 
     for await (const chunk of stream) {
-      fullContent += chunk;
-      
-      const data = JSON.stringify({ 
-        type: 'content', 
-        content: chunk,
-        fullContent 
-      });
-      res.write(`data: ${data}\n\n`);
+      if (clientClosed) {
+        break;
+      }
+
+      contentParts.push(chunk);
+      await batcher.push(chunk);
+    }
+
+    if (clientClosed) {
+      batcher.cancel();
+      return;
     }
 
-    res.write(`data: ${JSON.stringify({ type: 'done', fullContent })}\n\n`);
+    await batcher.flush();
+    await writer.write(DONE_EVENT_HEAD + JSON.stringify(contentParts.join('')) + EVENT_TAIL);
     res.end();
   } catch (error: any) {
+    await batcher.flush();
     const errorData = JSON.stringify({ 
       type: 'error', 
       error: error.message || 'An error occurred during streaming' 
     });
-    res.write(`data: ${errorData}\n\n`);
+    res.write(SSE_PREFIX + errorData + SSE_SUFFIX);
     res.end();
   }
 });
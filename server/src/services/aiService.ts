@@ -1,3 +1,4 @@
+import { createHash } from 'crypto';
 import OpenAI from 'openai';
 import { config } from '../config';
 import { AIRequest, AIResponse, EmbeddingRequest, EmbeddingResponse } from '../types';
@@ -45,31 +46,47 @@ const API_BASE_URLS: Record<string, string> = {
   deepseek: 'https://api.deepseek.com/v1',
 };
 
+/**
+ * 消息角色
+ */
+type MessageRole = 'system' | 'user' | 'assistant';
+
+/**
+ * 合法消息角色集合，校验每条消息时直接查表，避免重复创建数组
+ */
+const VALID_ROLES: ReadonlySet<string> = new Set<MessageRole>(['system', 'user', 'assistant']);
+
+/**
+ * 客户端缓存上限
+ */
+const MAX_CACHED_CLIENTS = 50;
+
+/**
+ * 连接测试成功结果的缓存时间（毫秒）与缓存上限
+ */
+const TEST_RESULT_TTL_MS = 5 * 60 * 1000;
+const MAX_CACHED_TEST_RESULTS = 100;
+
+/**
+ * 连接测试结果
+ */
+type TestResult = { success: boolean; message?: string; error?: string };
+
 /**
  * AI服务类
  * 提供与各种AI模型的交互功能
  */
 class AIService {
   private openai: OpenAI | null = null;
-  private static instance: AIService;
+  private clients: Map<string, OpenAI> = new Map();
+  private testResults: Map<string, { expiresAt: number; result: Promise<TestResult> }> = new Map();
 
-  private constructor() {
+  constructor() {
     if (config.ai.openaiApiKey) {
       this.openai = new OpenAI({ apiKey: config.ai.openaiApiKey });
     }
   }
 
-  /**
-   * 获取AI服务单例
-   * @returns AIService实例
-   */
-  static getInstance(): AIService {
-    if (!AIService.instance) {
-      AIService.instance = new AIService();
-    }
-    return AIService.instance;
-  }
-
   /**
    * 获取OpenAI客户端
    * @param apiKey - API密钥
@@ -83,12 +100,27 @@ class AIService {
       if (!effectiveBaseUrl && provider && API_BASE_URLS[provider]) {
         effectiveBaseUrl = API_BASE_URLS[provider];
       }
-      return new OpenAI({ 
-        apiKey, 
-        baseURL: effectiveBaseUrl || 'https://api.openai.com/v1',
-        timeout: 60000,
-        maxRetries: 2,
-      });
+      const baseURL = effectiveBaseUrl || 'https://api.openai.com/v1';
+      const cacheKey = createHash('sha256').update(`${baseURL}\n${apiKey}`).digest('hex');
+
+      let client = this.clients.get(cacheKey);
+      if (!client) {
+        client = new OpenAI({ 
+          apiKey, 
+          baseURL,
+          timeout: 60000,
+          maxRetries: 2,
+        });
+
+        if (this.clients.size >= MAX_CACHED_CLIENTS) {
+          const oldestKey = this.clients.keys().next().value;
+          if (oldestKey !== undefined) {
+            this.clients.delete(oldestKey);
+          }
+        }
+        this.clients.set(cacheKey, client);
+      }
+      return client;
     }
     if (!this.openai) {
       throw new Error('API key not configured. Please provide an API key in settings.');
@@ -116,7 +148,7 @@ class AIService {
           error: 'Invalid message content',
         };
       }
-      if (!['system', 'user', 'assistant'].includes(msg.role)) {
+      if (!VALID_ROLES.has(msg.role)) {
         return {
           success: false,
           error: `Invalid message role: ${msg.role}`,
@@ -142,7 +174,7 @@ class AIService {
       const response = await client.chat.completions.create({
         model,
         messages: request.messages.map(m => ({
-          role: m.role as 'system' | 'user' | 'assistant',
+          role: m.role as MessageRole,
           content: m.content.trim(),
         })),
         temperature,
@@ -181,7 +213,7 @@ class AIService {
    * @param options - 测试选项
    * @returns 测试结果
    */
-  async testConnection(options: TestOptions): Promise<{ success: boolean; message?: string; error?: string }> {
+  async testConnection(options: TestOptions): Promise<TestResult> {
     if (!options.apiKey || typeof options.apiKey !== 'string') {
       return { success: false, error: 'API Key is required' };
     }
@@ -190,6 +222,43 @@ class AIService {
       return { success: false, error: 'Invalid API Key format' };
     }
 
+    const cacheKey = createHash('sha256')
+      .update([options.provider, options.model, options.baseUrl, options.apiKey].join('\n'))
+      .digest('hex');
+    const now = Date.now();
+
+    const cached = this.testResults.get(cacheKey);
+    if (cached && cached.expiresAt > now) {
+      return cached.result;
+    }
+
+    if (this.testResults.size >= MAX_CACHED_TEST_RESULTS) {
+      for (const [key, entry] of this.testResults) {
+        if (entry.expiresAt <= now) {
+          this.testResults.delete(key);
+        }
+      }
+      if (this.testResults.size >= MAX_CACHED_TEST_RESULTS) {
+        this.testResults.clear();
+      }
+    }
+
+    const result = this.runConnectionTest(options);
+    this.testResults.set(cacheKey, { expiresAt: now + TEST_RESULT_TTL_MS, result });
+
+    const resolved = await result;
+    if (!resolved.success) {
+      this.testResults.delete(cacheKey);
+    }
+    return resolved;
+  }
+
+  /**
+   * 向上游发送最小请求以验证API配置
+   * @param options - 测试选项
+   * @returns 测试结果
+   */
+  private async runConnectionTest(options: TestOptions): Promise<TestResult> {
     try {
       const client = this.getOpenAIClient(options.apiKey, options.baseUrl, options.provider);
       
@@ -236,7 +305,7 @@ class AIService {
       if (!msg.content || typeof msg.content !== 'string') {
         throw new Error('Invalid message content');
       }
-      if (!['system', 'user', 'assistant'].includes(msg.role)) {
+      if (!VALID_ROLES.has(msg.role)) {
         throw new Error(`Invalid message role: ${msg.role}`);
       }
     }
@@ -259,7 +328,7 @@ class AIService {
       const stream = await client.chat.completions.create({
         model,
         messages: request.messages.map(m => ({
-          role: m.role as 'system' | 'user' | 'assistant',
+          role: m.role as MessageRole,
           content: m.content.trim(),
         })),
         temperature,
@@ -268,9 +337,9 @@ class AIService {
       });
 
       for await (const chunk of stream) {
-        const content = chunk.choices[0]?.delta?.content || '';
-        if (content) {
-          yield content;
+        const delta = chunk.choices[0]?.delta;
+        if (delta?.content) {
+          yield delta.content;
         }
       }
     } catch (error: any) {
@@ -414,4 +483,4 @@ class AIService {
   }
 }
 
-export const aiService = AIService.getInstance();
+export const aiService = new AIService();
@@ -6,6 +6,7 @@ class ConversationService {
   private memoryConversations: Map<string, Conversation> = new Map();
 
   async createConversation(nodeId: string, userId?: string): Promise<Conversation> {
+    const now = new Date();
     const conversation: Conversation = {
       id: uuidv4(),
       nodeId,
@@ -15,8 +16,8 @@ class ConversationService {
         includeRelatedNodes: [],
       },
       userId,
-      createdAt: new Date(),
-      updatedAt: new Date(),
+      createdAt: now,
+      updatedAt: now,
     };
 
     if (mongoDBService.isConnected()) {
@@ -28,8 +29,9 @@ class ConversationService {
   }
 
   async getConversation(id: string): Promise<Conversation | null> {
-    if (this.memoryConversations.has(id)) {
-      return this.memoryConversations.get(id) || null;
+    const cached = this.memoryConversations.get(id);
+    if (cached) {
+      return cached;
     }
 
     if (mongoDBService.isConnected()) {
@@ -63,19 +65,20 @@ class ConversationService {
     const conversation = await this.getConversation(conversationId);
     if (!conversation) throw new Error('Conversation not found');
 
+    const now = new Date();
     const newMessage: Message = {
       ...message,
       _id: uuidv4(),
-      timestamp: new Date(),
+      timestamp: now,
     };
 
     conversation.messages.push(newMessage);
-    conversation.updatedAt = new Date();
+    conversation.updatedAt = now;
 
     if (mongoDBService.isConnected()) {
       await mongoDBService.updateOne('conversations', { id: conversationId } as any, {
         $push: { messages: newMessage },
-        $set: { updatedAt: new Date() },
+        $set: { updatedAt: now },
       } as any);
     }
 
@@ -92,7 +95,7 @@ class ConversationService {
 
     if (mongoDBService.isConnected()) {
       await mongoDBService.updateOne('conversations', { id: conversationId } as any, {
-        $set: { messages: [], updatedAt: new Date() },
+        $set: { messages: [], updatedAt: conversation.updatedAt },
       } as any);
     }
 
@@ -115,7 +118,7 @@ class ConversationService {
 
     if (mongoDBService.isConnected()) {
       await mongoDBService.updateOne('conversations', { id: conversationId } as any, {
-        $set: { contextConfig: conversation.contextConfig, updatedAt: new Date() },
+        $set: { contextConfig: conversation.contextConfig, updatedAt: conversation.updatedAt },
       } as any);
     }
 
@@ -23,8 +23,13 @@ class HistoryService {
       timestamp: new Date(),
     };
 
+    /**
+     * 持久化不阻塞请求：历史记录只在查看或撤销时才会被读取，且读取走内存
+     */
     if (mongoDBService.isConnected()) {
-      await mongoDBService.insertOne('history', record);
+      mongoDBService.insertOne('history', record).catch((error) => {
+        console.error('Failed to persist history record:', error);
+      });
     }
 
     this.memoryHistory.push(record);
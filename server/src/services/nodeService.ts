@@ -16,6 +16,93 @@ const DEFAULT_POSITION = { x: 100, y: 100 };
 class NodeService {
   private memoryNodes: Map<string, Node> = new Map();
   private memoryRelations: Relation[] = [];
+  private relationsByNode: Map<string, Relation[]> = new Map();
+  private rootNodeIds: Set<string> = new Set();
+  private nodeLocks: Map<string, Promise<void>> = new Map();
+
+  /**
+   * 写入内存节点并同步维护根节点索引
+   * @param node - 节点数据
+   */
+  private storeNode(node: Node): void {
+    this.memoryNodes.set(node.id, node);
+    if (node.isRoot) {
+      this.rootNodeIds.add(node.id);
+    } else {
+      this.rootNodeIds.delete(node.id);
+    }
+  }
+
+  /**
+   * 移除内存节点并同步维护根节点索引
+   * @param id - 节点ID
+   */
+  private removeNode(id: string): void {
+    this.memoryNodes.delete(id);
+    this.rootNodeIds.delete(id);
+  }
+
+  /**
+   * 将关系加入两端节点的关系索引
+   * @param relation - 关系数据
+   */
+  private indexRelation(relation: Relation): void {
+    const endpoints = relation.sourceId === relation.targetId
+      ? [relation.sourceId]
+      : [relation.sourceId, relation.targetId];
+    for (const nodeId of endpoints) {
+      const relations = this.relationsByNode.get(nodeId);
+      if (relations) {
+        relations.push(relation);
+      } else {
+        this.relationsByNode.set(nodeId, [relation]);
+      }
+    }
+  }
+
+  /**
+   * 从两端节点的关系索引中移除关系
+   * @param relation - 关系数据
+   */
+  private unindexRelation(relation: Relation): void {
+    for (const nodeId of [relation.sourceId, relation.targetId]) {
+      const relations = this.relationsByNode.get(nodeId);
+      if (!relations) continue;
+      const remaining = relations.filter(r => r.id !== relation.id);
+      if (remaining.length > 0) {
+        this.relationsByNode.set(nodeId, remaining);
+      } else {
+        this.relationsByNode.delete(nodeId);
+      }
+    }
+  }
+
+  /**
+   * 在节点级互斥锁内执行任务
+   * 串行化同一节点上跨 await 的读-改-写操作，避免并发请求互相覆盖
+   * @param nodeId - 节点ID
+   * @param task - 需要互斥执行的任务
+   * @returns 任务结果
+   */
+  private async withNodeLock<T>(nodeId: string, task: () => Promise<T>): Promise<T> {
+    const previous = this.nodeLocks.get(nodeId) || Promise.resolve();
+    let release!: () => void;
+    const current = new Promise<void>(resolve => {
+      release = resolve;
+    });
+    const tail = previous.then(() => current);
+    this.nodeLocks.set(nodeId, tail);
+
+    await previous;
+    try {
+      return await task();
+    } finally {
+      release();
+      if (this.nodeLocks.get(nodeId) === tail) {
+        this.nodeLocks.delete(nodeId);
+      }
+    }
+  }
 
   /**
    * 创建节点
@@ -28,6 +115,7 @@ class NodeService {
       throw new Error(`Node with id ${nodeData.id} already exists`);
     }
 
+    const now = new Date();
     const node: Node = {
       id: nodeData.id || uuidv4(),
       title: nodeData.title?.trim() || '新节点',
@@ -44,8 +132,8 @@ class NodeService {
       parentIds: nodeData.parentIds || [],
       childrenIds: nodeData.childrenIds || [],
       userId,
-      createdAt: new Date(),
-      updatedAt: new Date(),
+      createdAt: now,
+      updatedAt: now,
     };
 
     if (neo4jService.isConnected()) {
@@ -59,7 +147,7 @@ class NodeService {
       }
     }
 
-    this.memoryNodes.set(node.id, node);
+    this.storeNode(node);
     return node;
   }
 
@@ -73,8 +161,9 @@ class NodeService {
       return null;
     }
 
-    if (this.memoryNodes.has(id)) {
-      return this.memoryNodes.get(id) || null;
+    const cached = this.memoryNodes.get(id);
+    if (cached) {
+      return cached;
     }
 
     if (neo4jService.isConnected()) {
@@ -85,7 +174,7 @@ class NodeService {
         );
         if (results.length > 0) {
           const node = results[0].n;
-          this.memoryNodes.set(id, node);
+          this.storeNode(node);
           return node;
         }
       } catch (error) {
@@ -136,7 +225,7 @@ class NodeService {
       }
     }
 
-    this.memoryNodes.set(id, updated);
+    this.storeNode(updated);
     return updated;
   }
 
@@ -158,31 +247,39 @@ class NodeService {
 
     if (neo4jService.isConnected()) {
       try {
-        for (const nodeId of allIds) {
-          await neo4jService.runQuery(
-            `MATCH (n:Node {id: $id}) DETACH DELETE n`,
-            { id: nodeId }
-          );
-        }
+        await neo4jService.runQuery(
+          `MATCH (n:Node) WHERE n.id IN $ids DETACH DELETE n`,
+          { ids: allIds }
+        );
       } catch (error) {
         console.error('Failed to delete nodes from Neo4j:', error);
       }
     }
 
-    for (const nodeId of allIds) {
-      this.memoryNodes.delete(nodeId);
-      this.memoryRelations = this.memoryRelations.filter(
-        r => r.sourceId !== nodeId && r.targetId !== nodeId
-      );
+    const deletedIds = new Set(allIds);
+    const deletedRelations = new Set<Relation>();
+    for (const nodeId of deletedIds) {
+      this.removeNode(nodeId);
+      for (const relation of this.relationsByNode.get(nodeId) || []) {
+        deletedRelations.add(relation);
+      }
+    }
+    if (deletedRelations.size > 0) {
+      this.memoryRelations = this.memoryRelations.filter(r => !deletedRelations.has(r));
+      for (const relation of deletedRelations) {
+        this.unindexRelation(relation);
+      }
     }
 
     for (const parentId of node.parentIds) {
-      const parent = await this.getNode(parentId);
-      if (parent) {
-        await this.updateNode(parentId, {
-          childrenIds: parent.childrenIds.filter(cid => cid !== id),
-        });
-      }
+      await this.withNodeLock(parentId, async () => {
+        const parent = await this.getNode(parentId);
+        if (parent) {
+          await this.updateNode(parentId, {
+            childrenIds: parent.childrenIds.filter(cid => cid !== id),
+          });
+        }
+      });
     }
 
     return true;
@@ -210,29 +307,37 @@ class NodeService {
    */
   async getAllDescendants(nodeId: string): Promise<Node[]> {
     const descendants: Node[] = [];
-    const visited = new Set<string>();
-    
+    const visited = new Set<string>([nodeId]);
+
+    const root = await this.getNode(nodeId);
+    if (!root) return descendants;
+
     /**
-     * 递归收集后代节点
-     * @param id - 当前节点ID
+     * 显式栈深度优先遍历，每帧记录待处理的子节点列表及当前位置
+     * 保持与递归实现相同的先序输出顺序，且每个节点只查询一次
      */
-    const collect = async (id: string) => {
-      if (visited.has(id)) return;
-      visited.add(id);
-      
-      const node = await this.getNode(id);
-      if (node) {
-        for (const childId of node.childrenIds) {
-          const child = await this.getNode(childId);
-          if (child && !visited.has(childId)) {
-            descendants.push(child);
-            await collect(childId);
-          }
-        }
+    const stack: Array<{ childIds: string[]; index: number }> = [
+      { childIds: root.childrenIds, index: 0 },
+    ];
+
+    while (stack.length > 0) {
+      const frame = stack[stack.length - 1];
+      if (frame.index >= frame.childIds.length) {
+        stack.pop();
+        continue;
       }
-    };
-    
-    await collect(nodeId);
+
+      const childId = frame.childIds[frame.index++];
+      if (visited.has(childId)) continue;
+
+      const child = await this.getNode(childId);
+      if (!child) continue;
+
+      visited.add(childId);
+      descendants.push(child);
+      stack.push({ childIds: child.childrenIds, index: 0 });
+    }
+
     return descendants;
   }
 
@@ -242,8 +347,14 @@ class NodeService {
    * @returns 根节点列表
    */
   async getRootNodes(userId?: string): Promise<Node[]> {
-    const nodes = await this.getAllNodes(userId);
-    return nodes.filter(n => n.isRoot && !n.hidden);
+    const roots: Node[] = [];
+    for (const id of this.rootNodeIds) {
+      const node = this.memoryNodes.get(id);
+      if (node && !node.hidden && (!userId || node.userId === userId)) {
+        roots.push(node);
+      }
+    }
+    return roots;
   }
 
   /**
@@ -254,36 +365,38 @@ class NodeService {
    * @returns 创建的子节点
    */
   async createChildNode(parentId: string, title: string, userId?: string): Promise<Node> {
-    const parent = await this.getNode(parentId);
-    if (!parent) {
-      throw new Error('Parent node not found');
-    }
-
-    const siblingCount = parent.childrenIds.length;
-    const position = {
-      x: parent.position.x + 250,
-      y: parent.position.y + siblingCount * 120,
-    };
+    return this.withNodeLock(parentId, async () => {
+      const parent = await this.getNode(parentId);
+      if (!parent) {
+        throw new Error('Parent node not found');
+      }
 
-    const child = await this.createNode({
-      title: title.trim() || '新分支',
-      parentIds: [parentId],
-      position,
-      isRoot: false,
-      userId,
-    }, userId);
+      const siblingCount = parent.childrenIds.length;
+      const position = {
+        x: parent.position.x + 250,
+        y: parent.position.y + siblingCount * 120,
+      };
+
+      const child = await this.createNode({
+        title: title.trim() || '新分支',
+        parentIds: [parentId],
+        position,
+        isRoot: false,
+        userId,
+      }, userId);
+
+      await this.updateNode(parentId, {
+        childrenIds: [...parent.childrenIds, child.id],
+      });
 
-    await this.updateNode(parentId, {
-      childrenIds: [...parent.childrenIds, child.id],
-    });
+      await this.insertRelation({
+        sourceId: parentId,
+        targetId: child.id,
+        type: 'parent-child',
+      });
 
-    await this.createRelation({
-      sourceId: parentId,
-      targetId: child.id,
-      type: 'parent-child',
+      return child;
     });
-
-    return child;
   }
 
   /**
@@ -303,7 +416,7 @@ class NodeService {
       throw new Error('Source or target node not found');
     }
 
-    const existingRelation = this.memoryRelations.find(
+    const existingRelation = this.relationsByNode.get(relationData.sourceId)?.find(
       r => r.sourceId === relationData.sourceId && 
            r.targetId === relationData.targetId &&
            r.type === relationData.type
@@ -313,6 +426,16 @@ class NodeService {
       return existingRelation;
     }
 
+    return this.insertRelation(relationData);
+  }
+
+  /**
+   * 写入关系（不做校验）
+   * 仅供内部在端点已确认存在且关系必然不重复时调用，如刚创建的子节点
+   * @param relationData - 关系数据
+   * @returns 创建的关系
+   */
+  private async insertRelation(relationData: Omit<Relation, 'id' | 'createdAt'>): Promise<Relation> {
     const relation: Relation = {
       id: uuidv4(),
       ...relationData,
@@ -332,6 +455,7 @@ class NodeService {
     }
 
     this.memoryRelations.push(relation);
+    this.indexRelation(relation);
     return relation;
   }
 
@@ -352,9 +476,7 @@ class NodeService {
     if (!nodeId || typeof nodeId !== 'string') {
       return [];
     }
-    return this.memoryRelations.filter(
-      r => r.sourceId === nodeId || r.targetId === nodeId
-    );
+    return [...(this.relationsByNode.get(nodeId) || [])];
   }
 
   /**
@@ -381,7 +503,8 @@ class NodeService {
       }
     }
 
-    this.memoryRelations.splice(index, 1);
+    const [relation] = this.memoryRelations.splice(index, 1);
+    this.unindexRelation(relation);
     return true;
   }
 
@@ -482,7 +605,9 @@ class NodeService {
    */
   clearMemoryData(): void {
     this.memoryNodes.clear();
+    this.rootNodeIds.clear();
     this.memoryRelations = [];
+    this.relationsByNode.clear();
   }
 }
 
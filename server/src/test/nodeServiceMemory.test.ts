@@ -0,0 +1,84 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { nodeService } from '../services/nodeService';
+
+/**
+ * 真实节点服务测试（未连接 Neo4j 时仅使用内存存储）
+ */
+describe('NodeService (in-memory store)', () => {
+  beforeEach(() => {
+    nodeService.clearMemoryData();
+  });
+
+  describe('createChildNode', () => {
+    it('should keep both children when created concurrently on the same parent', async () => {
+      const parent = await nodeService.createNode({ title: 'Parent', isRoot: true });
+
+      const [first, second] = await Promise.all([
+        nodeService.createChildNode(parent.id, 'First'),
+        nodeService.createChildNode(parent.id, 'Second'),
+      ]);
+
+      const updatedParent = await nodeService.getNode(parent.id);
+      expect(updatedParent?.childrenIds).toHaveLength(2);
+      expect(updatedParent?.childrenIds).toEqual(expect.arrayContaining([first.id, second.id]));
+      expect((nodeService as any).nodeLocks.size).toBe(0);
+    });
+  });
+
+  describe('relation index', () => {
+    it('should drop a deleted relation from getRelationsForNode', async () => {
+      const source = await nodeService.createNode({ title: 'Source' });
+      const target = await nodeService.createNode({ title: 'Target' });
+      const supports = await nodeService.createRelation({ sourceId: source.id, targetId: target.id, type: 'supports' });
+      const references = await nodeService.createRelation({ sourceId: source.id, targetId: target.id, type: 'references' });
+
+      expect(await nodeService.deleteRelation(supports.id)).toBe(true);
+
+      expect((await nodeService.getRelationsForNode(source.id)).map(r => r.id)).toEqual([references.id]);
+      expect((await nodeService.getRelationsForNode(target.id)).map(r => r.id)).toEqual([references.id]);
+    });
+
+    it('should remove subtree relations when deleting a node', async () => {
+      const root = await nodeService.createNode({ title: 'Root', isRoot: true });
+      const child = await nodeService.createChildNode(root.id, 'Child');
+      const grandchild = await nodeService.createChildNode(child.id, 'Grandchild');
+      const outside = await nodeService.createNode({ title: 'Outside' });
+      await nodeService.createRelation({ sourceId: grandchild.id, targetId: outside.id, type: 'supports' });
+      const kept = await nodeService.createRelation({ sourceId: root.id, targetId: outside.id, type: 'references' });
+
+      expect(await nodeService.deleteNode(child.id)).toBe(true);
+
+      expect(await nodeService.getNode(grandchild.id)).toBeNull();
+      expect((await nodeService.getNode(root.id))?.childrenIds).toEqual([]);
+      expect(await nodeService.getRelationsForNode(child.id)).toEqual([]);
+      expect(await nodeService.getRelationsForNode(grandchild.id)).toEqual([]);
+      expect((await nodeService.getRelationsForNode(outside.id)).map(r => r.id)).toEqual([kept.id]);
+      expect((await nodeService.getRelationsForNode(root.id)).map(r => r.id)).toEqual([kept.id]);
+      expect((await nodeService.getRelations()).map(r => r.id)).toEqual([kept.id]);
+    });
+
+    it('should index a self-loop relation once', async () => {
+      const node = await nodeService.createNode({ title: 'Loop' });
+      const loop = await nodeService.createRelation({ sourceId: node.id, targetId: node.id, type: 'elaborates' });
+
+      expect((await nodeService.getRelationsForNode(node.id)).map(r => r.id)).toEqual([loop.id]);
+
+      expect(await nodeService.deleteRelation(loop.id)).toBe(true);
+      expect(await nodeService.getRelationsForNode(node.id)).toEqual([]);
+    });
+
+    it('should return the existing relation for a duplicate', async () => {
+      const source = await nodeService.createNode({ title: 'Source' });
+      const target = await nodeService.createNode({ title: 'Target' });
+
+      const first = await nodeService.createRelation({ sourceId: source.id, targetId: target.id, type: 'supports' });
+      const second = await nodeService.createRelation({ sourceId: source.id, targetId: target.id, type: 'supports' });
+      const reversed = await nodeService.createRelation({ sourceId: target.id, targetId: source.id, type: 'supports' });
+
+      expect(second.id).toBe(first.id);
+      expect(reversed.id).not.toBe(first.id);
+      expect(await nodeService.getRelationsForNode(source.id)).toHaveLength(2);
+      expect(await nodeService.getRelations()).toHaveLength(2);
+    });
+  });
+});
@@ -0,0 +1,141 @@
+import { describe, it, expect, afterEach } from 'vitest';
+import http from 'http';
+import { AddressInfo } from 'net';
+import { randomBytes } from 'crypto';
+import { gunzipSync } from 'zlib';
+import express from 'express';
+import compression from 'compression';
+import { SSEWriter, ContentFrameBatcher } from '../utils/sse';
+
+/**
+ * 帧数量与单帧大小：帧内容不可压缩且远大于 zlib 缓冲区，保证每次写入都触发背压
+ */
+const FRAME_COUNT = 64;
+const FRAME_BYTES = 32 * 1024;
+
+/**
+ * 以慢速读取方式请求 gzip 压缩的响应
+ * @param port - 服务端口
+ * @returns 解压后的响应体
+ */
+const fetchSlowly = (port: number): Promise<string> =>
+  new Promise((resolve, reject) => {
+    const req = http.get(
+      { port, path: '/stream', headers: { 'Accept-Encoding': 'gzip' } },
+      (res) => {
+        const chunks: Buffer[] = [];
+        res.on('data', (chunk: Buffer) => {
+          chunks.push(chunk);
+          res.pause();
+          setTimeout(() => res.resume(), 2);
+        });
+        res.on('end', () => resolve(gunzipSync(Buffer.concat(chunks)).toString()));
+        res.on('error', reject);
+      }
+    );
+    req.on('error', reject);
+  });
+
+describe('SSEWriter', () => {
+  let server: http.Server | null = null;
+
+  afterEach(() => {
+    server?.close();
+    server = null;
+  });
+
+  it('should wait for drain behind compression without leaking listeners', async () => {
+    const warnings: Error[] = [];
+    const onWarning = (warning: Error) => warnings.push(warning);
+    process.on('warning', onWarning);
+
+    let blockedWrites = 0;
+    const app = express();
+    app.use(compression());
+    app.get('/stream', async (_req, res) => {
+      res.setHeader('Content-Type', 'text/event-stream');
+      const write = res.write.bind(res) as (chunk: string) => boolean;
+      (res as any).write = (chunk: string) => {
+        const writable = write(chunk);
+        if (!writable) blockedWrites++;
+        return writable;
+      };
+
+      const writer = new SSEWriter(res);
+      for (let i = 0; i < FRAME_COUNT; i++) {
+        await writer.write(JSON.stringify({ index: i, data: randomBytes(FRAME_BYTES).toString('base64') }));
+      }
+      res.end();
+    });
+
+    const activeServer = app.listen(0);
+    server = activeServer;
+    await new Promise(resolve => activeServer.once('listening', resolve));
+
+    try {
+      const body = await fetchSlowly((activeServer.address() as AddressInfo).port);
+      const frames = body.split('\n\n').filter(Boolean);
+
+      expect(frames).toHaveLength(FRAME_COUNT);
+      expect(JSON.parse(frames[FRAME_COUNT - 1].slice('data: '.length)).index).toBe(FRAME_COUNT - 1);
+      expect(blockedWrites).toBeGreaterThan(10);
+      expect(warnings.filter(w => w.name === 'MaxListenersExceededWarning')).toHaveLength(0);
+    } finally {
+      process.off('warning', onWarning);
+    }
+  }, 20000);
+});
+
+/**
+ * 等待指定毫秒数
+ * @param ms - 毫秒数
+ */
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+describe('ContentFrameBatcher', () => {
+  it('should hold new chunks behind a timer-flushed frame that is still draining', async () => {
+    const frames: string[] = [];
+    const releases: Array<() => void> = [];
+    let activeWrites = 0;
+    let maxActiveWrites = 0;
+
+    const writer = {
+      write: (payload: string) => {
+        frames.push(JSON.parse(payload).content);
+        activeWrites++;
+        maxActiveWrites = Math.max(maxActiveWrites, activeWrites);
+        return new Promise<void>(resolve => {
+          releases.push(() => {
+            activeWrites--;
+            resolve();
+          });
+        });
+      },
+    } as unknown as SSEWriter;
+
+    const batcher = new ContentFrameBatcher(writer);
+
+    await batcher.push('a');
+    await sleep(20);
+    expect(frames).toEqual(['a']);
+
+    let pushed = false;
+    const nextPush = batcher.push('b').then(() => {
+      pushed = true;
+    });
+    await sleep(20);
+    expect(pushed).toBe(false);
+
+    releases.shift()!();
+    await nextPush;
+    expect(pushed).toBe(true);
+
+    const finalFlush = batcher.flush();
+    await sleep(0);
+    releases.shift()!();
+    await finalFlush;
+
+    expect(frames).toEqual(['a', 'b']);
+    expect(maxActiveWrites).toBe(1);
+  });
+});
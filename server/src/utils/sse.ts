@@ -0,0 +1,143 @@
+import { Response } from 'express';
+
+/**
+ * SSE 帧前缀与后缀
+ */
+export const SSE_PREFIX = 'data: ';
+export const SSE_SUFFIX = '\n\n';
+
+/**
+ * 预编码的 SSE 事件模板，每帧只需序列化字符串值
+ */
+export const CONTENT_EVENT_HEAD = '{"type":"content","content":';
+export const DONE_EVENT_HEAD = '{"type":"done","fullContent":';
+export const EVENT_TAIL = '}';
+
+/**
+ * 单帧最多合并的内容片段数与最长等待时间（毫秒）
+ */
+const FRAME_MAX_CHUNKS = 8;
+const FRAME_MAX_DELAY_MS = 5;
+
+/**
+ * SSE 写入器，写缓冲区已满时等待排空
+ * compression 中间件会把 res 上的 'drain' 监听转挂到 zlib 流，但不会改写 res.off，
+ * 每次等待都注册再移除监听会在压缩流上不断累积监听器。
+ * 因此每个响应只注册一次 drain/close 监听，由等待队列唤醒
+ */
+export class SSEWriter {
+  private res: Response;
+  private drainWaiters: Array<() => void> = [];
+  private closed = false;
+
+  constructor(res: Response) {
+    this.res = res;
+    res.on('drain', () => this.releaseWaiters());
+    res.on('close', () => {
+      this.closed = true;
+      this.releaseWaiters();
+    });
+  }
+
+  /**
+   * 唤醒所有等待排空的写入
+   */
+  private releaseWaiters(): void {
+    const waiters = this.drainWaiters;
+    this.drainWaiters = [];
+    for (const resolve of waiters) {
+      resolve();
+    }
+  }
+
+  /**
+   * 等待响应缓冲区排空或连接关闭
+   */
+  private waitForDrain(): Promise<void> {
+    if (this.closed || this.res.destroyed) {
+      return Promise.resolve();
+    }
+    return new Promise(resolve => {
+      this.drainWaiters.push(resolve);
+    });
+  }
+
+  /**
+   * 写入一帧 SSE 数据
+   * compression 中间件会缓冲压缩输出，因此每帧写入后立即刷新
+   * @param payload - 已序列化的帧内容
+   */
+  async write(payload: string): Promise<void> {
+    const writable = this.res.write(SSE_PREFIX + payload + SSE_SUFFIX);
+    this.res.flush();
+    if (!writable) {
+      await this.waitForDrain();
+    }
+  }
+}
+
+/**
+ * 内容帧合并器
+ * 将短时间内到达的多个内容片段合并为一帧写出，减少套接字写入次数
+ * 所有写出（包括定时触发的）串行排队，push 会等待排队中的写出完成，使背压传递到读取循环
+ */
+export class ContentFrameBatcher {
+  private writer: SSEWriter;
+  private pending: string[] = [];
+  private timer: NodeJS.Timeout | null = null;
+  private inFlight: Promise<void> = Promise.resolve();
+
+  constructor(writer: SSEWriter) {
+    this.writer = writer;
+  }
+
+  /**
+   * 追加内容片段，达到合并上限时立即写出
+   * @param chunk - 内容片段
+   */
+  async push(chunk: string): Promise<void> {
+    await this.inFlight;
+    this.pending.push(chunk);
+
+    if (this.pending.length >= FRAME_MAX_CHUNKS) {
+      await this.flush();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        void this.flush();
+      }, FRAME_MAX_DELAY_MS);
+    }
+  }
+
+  /**
+   * 写出所有待发送的内容片段，排在上一次写出之后执行
+   */
+  flush(): Promise<void> {
+    this.cancel();
+    this.inFlight = this.inFlight.then(() => this.writePending());
+    return this.inFlight;
+  }
+
+  /**
+   * 取消尚未触发的定时写出
+   */
+  cancel(): void {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+  }
+
+  /**
+   * 将当前待发送的片段合并为一帧写出
+   */
+  private async writePending(): Promise<void> {
+    if (this.pending.length === 0) {
+      return;
+    }
+
+    const content = this.pending.join('');
+    this.pending = [];
+    await this.writer.write(CONTENT_EVENT_HEAD + JSON.stringify(content) + EVENT_TAIL);
+  }
+}